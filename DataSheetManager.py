@@ -44,16 +44,28 @@ class DataSheetManager:
                 return loader, self.DATASHEET_URLS[loader]
         return None, (None, None)
 
+    def get_path(self, controller: str):
+        """Path of controller's datasheet, it might be not downloaded yet. None for unknown controller."""
+        known_controller, _ = self.get_datasheet_loader(controller)
+        if known_controller:
+            path = Path('./') / 'Datasheets' / known_controller / "{}.pdf".format(controller)
+            return path.absolute()
+        return None
+
     def iterate_paths(self):
         for controller in self.datasheets:
-            known_controller, (url, datasheet_loader) = self.get_datasheet_loader(controller)
-            if known_controller:
-                path = Path('./') / 'Datasheets' / known_controller / "{}.pdf".format(controller)
-                path = path.absolute()
+            path = self.get_path(controller)
+            if path:
                 yield path
 
-    def get_or_download(self):
-        with tqdm(self.datasheets,desc="Parsing datasheet",) as bar:
+    def get_or_download(self, controllers: List[str] = None, load=True):
+        """Loads or downloads datasheets of given controllers, all known controllers by default.
+
+        With load=False datasheets are only downloaded, useful when they are parsed in other process.
+        """
+        if controllers is None:
+            controllers = self.datasheets
+        with tqdm(controllers,desc="Parsing datasheet",) as bar:
             for controller in bar:
                 bar.set_description('Parsing {}'.format(controller))
                 known_controller, (url, datasheet_loader) = self.get_datasheet_loader(controller)
@@ -67,9 +79,7 @@ class DataSheetManager:
                         path = path.absolute()
                         if not path.parent.exists():
                             path.parent.mkdir(exist_ok=True)
-                        if path.exists():
-                            datasheet = datasheet_loader(str(path))
-                        else:
+                        if not path.exists():
                             if self.get_datasheet_loader(controller)[0] == 'MK':
                                 print('CAN\'T DOWNLOAD NXP DATASHEETS AUTOMATICALLY', file=sys.stderr)
                                 print('PLEASE ADD {} DATASHEET MANUALLY!'.format(controller), file=sys.stderr)
@@ -87,15 +97,21 @@ class DataSheetManager:
                                             f.write(chunk)
                                             f.flush()
                                     f.close()
-                                datasheet = datasheet_loader(str(path))
                             else:
                                 raise Exception('Invalid controller name')
-                        self.datasheets_datasheets[controller.upper()] = datasheet
+                        if load:
+                            self.datasheets_datasheets[controller.upper()] = datasheet_loader(str(path), lazy=True)
                     else:
                         raise Exception(
                             'DATASHEET\LOADER for {} was not found\n'
                             'Proposal: remove or correct name of it'.format(controller))
 
+    def release(self, controller: str):
+        """Closes and forgets loaded datasheet of controller."""
+        datasheet = self.datasheets_datasheets.pop(controller.upper(), None)
+        if datasheet:
+            datasheet.close()
+
     def __getitem__(self, item: str):
         return self.datasheets_datasheets.get(item.upper(), None)
 
@@ -1,14 +1,18 @@
+import hashlib
+import io
 import os
+import re
 import sys
 import traceback
 import unicodedata
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Any, Dict, List, Set, Tuple
 
 import PyPDF3
 from tqdm import tqdm
 import requests
 from PyPDF3.pdf import PageObject
+from PyPDF3.generic import IndirectObject
 import pdfplumber
 
 
@@ -16,6 +20,22 @@ def join(to_join, separator=' '):
     return separator.join(map(str, to_join))
 
 
+def ref_key(obj):
+    """Hashable key for PDF object reference (or array of references)."""
+    if isinstance(obj, IndirectObject):
+        return obj.idnum, obj.generation
+    if isinstance(obj, list):
+        return tuple(ref_key(item) for item in obj)
+    return id(obj)
+
+
+def release_page(page: pdfplumber.pdf.Page):
+    """Drops layout objects pdfplumber cached on page, page is parsed again if it's used later."""
+    flush = getattr(page, 'close', None) or getattr(page, 'flush_cache', None)  # close() in newer pdfplumber
+    if flush:
+        flush()
+
+
 class DataSheetNode:
 
     def __init__(self, name: str, path: List[int]) -> None:
@@ -32,11 +52,19 @@ class DataSheetNode:
         self.childs = []  # type: List[DataSheetNode]
         self.parent = None  # type: DataSheetNode
         self._page = None  # type: PageObject
-        self._page_plumber = None  # type: pdfplumber.pdf.Page
+        self._plumber = None  # type: pdfplumber.pdf.PDF
+        self.page_num = -1
+        # Lookup indexes, only root node's indexes are used
+        self._path_index = {tuple(path): self}  # type: Dict[Tuple[int, ...], DataSheetNode]
+        self._name_index = {}  # type: Dict[str, DataSheetNode]
+        self._type_index = {}  # type: Dict[type, DataSheetNode]
 
     @property
     def page(self):
-        return self._page_plumber
+        """pdfplumber page of node, node keeps only page number so released pages aren't pinned by TOC."""
+        if self._plumber is None or self.page_num < 0:
+            return None
+        return self._plumber.pages[self.page_num]
 
     def __repr__(self):
         return '<{} {}-"{}">'.format(self.__class__.__name__, join(self.path, '.'), self.name)
@@ -53,7 +81,10 @@ class DataSheetNode:
         """
         ret_node: 'DataSheetNode' = None
         if not prev_node:
-            prev_node = self.get_root_node()
+            node = self.get_root_node()._path_index.get(tuple(path))
+            if node is not None and node.path != path:  # path was changed after node was indexed
+                return self.get_node_by_path(path, self.get_root_node())
+            return node
         if prev_node.path == path:
             return prev_node
         else:
@@ -74,7 +105,10 @@ class DataSheetNode:
         """
         ret_node: 'DataSheetNode' = None
         if not prev_node:
-            prev_node = self.get_root_node()
+            root = self.get_root_node()
+            if name not in root._name_index:
+                root._name_index[name] = self.get_node_by_name(name, root)
+            return root._name_index[name]
         if name in prev_node.name:
             return prev_node
         else:
@@ -95,7 +129,10 @@ class DataSheetNode:
         """
         ret_node: 'DataSheetNode' = None
         if not prev_node:
-            prev_node = self.get_root_node()
+            root = self.get_root_node()
+            if node_type not in root._type_index:
+                root._type_index[node_type] = self.get_node_by_type(node_type, root)
+            return root._type_index[node_type]
         if prev_node.__class__ == node_type:
             return prev_node
         else:
@@ -155,6 +192,21 @@ class DataSheetNode:
     def append(self, node: 'DataSheetNode'):
         self.childs.append(node)
         node.parent = self
+        self.index_node(node)
+
+    def index_node(self, node: 'DataSheetNode'):
+        """Adds node and it's childs to root node indexes.
+
+            Args:
+                node: newly attached node.
+        """
+        root = self.get_root_node()
+        root._path_index.setdefault(tuple(node.path), node)
+        for child in node.flatout(node):
+            root._path_index.setdefault(tuple(child.path), child)
+        # name and type lookups must return first node in tree order, so they are recomputed on demand
+        root._name_index.clear()
+        root._type_index.clear()
 
     def new(self, name, path):
         node = DataSheetNode(name, path)
@@ -206,20 +258,194 @@ class DataSheetTableNode(DataSheetNode):
 
 class DataSheet:
 
-    def __init__(self, datasheet_path):
+    def __init__(self, datasheet_path, lazy=False):
+        """
+        Constructor of DataSheet class.
+
+        Args:
+            datasheet_path: Path to PDF file.
+            lazy: Postpone outline parsing until table of content is accessed.
+
+        """
         self.path = Path(datasheet_path)
-        self.pdf_file = PyPDF3.PdfFileReader(self.path.open('rb'))
-        self.plumber = pdfplumber.load(self.path.open('rb'))
-        self.raw_outline = []
-        self.tables, self.figures = {}, {}  # type: Dict
-        self.table_of_content = DataSheetNode('ROOT', [0])
-        self.table_root = DataSheetNode('TABLES', [-1])
-        self.table_of_content.append(self.table_root)
-        self.fallback_table: DataSheetTableNode = None
+        data = self.path.read_bytes()  # both parsers share one read of the file
+        self.sha256 = hashlib.sha256(data).hexdigest()
+        self.pdf_file = PyPDF3.PdfFileReader(io.BytesIO(data))
+        self.plumber = pdfplumber.load(io.BytesIO(data))
+        self.figures = {}  # type: Dict
+        self._raw_outline = []
+        self._tables = {}  # type: Dict
+        self._table_of_content = DataSheetNode('ROOT', [0])
+        self._table_root = DataSheetNode('TABLES', [-1])
+        self._table_of_content.append(self._table_root)
+        self._fallback_table: DataSheetTableNode = None
+        self._outline_loaded = False
+        self._page_refs = None  # type: Dict[int,int]
+        self._page_contents = None  # type: Dict[Any,int]
+        self._text_cache = {}  # type: Dict[Tuple,Any]
+        self._raw_text = {}  # type: Dict[int,str]
+        self._raw_text_trusted = None  # type: bool
+        if not lazy:
+            self.load_outline()
+
+    def load_outline(self):
+        """Parses outline into table of content, does nothing if it's already parsed."""
+        if self._outline_loaded:
+            return
+        self._outline_loaded = True
         self.flatten_outline()
         self.sort_raw_outline()
         self.collect_tables()
 
+    @property
+    def raw_outline(self):
+        self.load_outline()
+        return self._raw_outline
+
+    @property
+    def tables(self):
+        self.load_outline()
+        return self._tables
+
+    @property
+    def table_of_content(self) -> DataSheetNode:
+        self.load_outline()
+        return self._table_of_content
+
+    @property
+    def table_root(self) -> DataSheetNode:
+        self.load_outline()
+        return self._table_root
+
+    @property
+    def fallback_table(self) -> DataSheetTableNode:
+        self.load_outline()
+        return self._fallback_table
+
+    @fallback_table.setter
+    def fallback_table(self, table: DataSheetTableNode):
+        self._fallback_table = table
+
+    def bind_page(self, node: DataSheetNode, page_ref):
+        """Attaches page to node, pdfplumber page is resolved only when node.page is read."""
+        node.page_num = self.get_page_num(page_ref)
+        node._plumber = self.plumber
+
+    def release_pages(self):
+        """Drops layout objects cached on every page, cached texts and words are kept."""
+        for page in self.plumber.pages:
+            release_page(page)
+
+    def close(self):
+        """Releases pages and text caches, called when datasheet is no longer needed."""
+        self.release_pages()
+        self._text_cache.clear()
+        self._raw_text.clear()
+
+    def _page_text_layer(self, kind, page_num, tolerances, release=True):
+        key = (kind, page_num, tuple(sorted(tolerances.items())))
+        if key not in self._text_cache:
+            page = self.plumber.pages[page_num]
+            try:
+                if kind == 'text':
+                    self._text_cache[key] = page.extract_text(**tolerances)
+                else:
+                    self._text_cache[key] = page.extract_words(**tolerances)
+            finally:
+                if release:  # result is cached, layout objects aren't needed anymore
+                    release_page(page)
+        return self._text_cache[key]
+
+    def page_text(self, page_num, **tolerances) -> str:
+        """
+        Text of page, extracted once for every set of tolerances.
+
+        Args:
+            page_num: Zero based page number.
+            **tolerances: x_tolerance and y_tolerance passed to pdfplumber.
+
+        Returns:
+            Page text, can be None for empty page.
+        """
+        return self._page_text_layer('text', page_num, tolerances)
+
+    def page_words(self, page_num, release=True, **tolerances) -> List[Dict[str, Any]]:
+        """
+        Words of page, extracted once for every set of tolerances.
+
+        Args:
+            page_num: Zero based page number.
+            release: Release page after words are extracted, False if caller still uses page and releases it.
+            **tolerances: x_tolerance and y_tolerance passed to pdfplumber.
+
+        Returns:
+            Shared list of pdfplumber word dicts, don't modify it.
+        """
+        return self._page_text_layer('words', page_num, tolerances, release)
+
+    def raw_page_text(self, page_num) -> str:
+        """
+        Lowercase text of page's content stream without whitespaces.
+
+        It's read straight from content stream, without layout analysis, so it's cheap but words can be glued
+        or split differently than in page_text. PyPDF3 ignores /ToUnicode maps and custom font encodings,
+        so for some documents this text is garbled, see raw_text_trusted.
+
+        Args:
+            page_num: Zero based page number.
+
+        Returns:
+            Text or empty string if no text could be read.
+        """
+        if page_num not in self._raw_text:
+            try:
+                text = self.pdf_file.getPage(page_num).extractText()
+            except Exception:
+                text = ''
+            self._raw_text[page_num] = ''.join(text.lower().split())
+        return self._raw_text[page_num]
+
+    def raw_text_trusted(self, page_num, **tolerances) -> bool:
+        """
+        Checks if raw_page_text of this document agrees with page_text.
+
+        Words of page_text are looked up in raw text of same page, result of first page with enough text
+        is kept for whole document. Until then raw text isn't trusted.
+
+        Args:
+            page_num: Zero based page number to check, page_text of it is extracted.
+            **tolerances: x_tolerance and y_tolerance passed to pdfplumber.
+        """
+        if self._raw_text_trusted is None:
+            words = re.findall(r'[a-z]{4,}', (self.page_text(page_num, **tolerances) or '').lower())
+            if len(words) >= 20:  # too few words to judge
+                raw_text = self.raw_page_text(page_num)
+                self._raw_text_trusted = sum(word in raw_text for word in words) >= 0.8 * len(words)
+        return bool(self._raw_text_trusted)
+
+    def search_page(self, page_num, pattern, keywords=(), flags=re.IGNORECASE, raw_index=True, **tolerances):
+        """
+        re.search over page_text, pages without any of keywords are rejected using raw_page_text.
+
+        Pages are rejected by raw text only when raw_text_trusted, so garbled raw text can't hide a match.
+
+        Args:
+            page_num: Zero based page number.
+            pattern: Regex to search in page text.
+            keywords: Words that must be in page for pattern to match.
+            flags: Regex flags.
+            raw_index: Use raw_page_text to reject pages, False always searches page_text.
+            **tolerances: x_tolerance and y_tolerance passed to pdfplumber.
+
+        Returns:
+            Match object or None.
+        """
+        if raw_index and keywords and self.raw_text_trusted(page_num, **tolerances):
+            raw_text = self.raw_page_text(page_num)
+            if raw_text and not all(''.join(keyword.lower().split()) in raw_text for keyword in keywords):
+                return None  # pages without readable content stream text are always checked
+        return re.search(pattern, self.page_text(page_num, **tolerances) or '', flags)
+
     def collect_tables(self):
         if len(self.tables) == 0:
             # print('NO TABLES WERE DETECTED IN OUTLINE! FALLING BACK TO PAGE SCANNING!')
@@ -227,9 +453,9 @@ class DataSheet:
             end_page = 0
             for thing in self.raw_outline:
                 if 'Description' in thing['/Title']:
-                    start_page = self.get_page_num(thing.page.getObject())
+                    start_page = self.get_page_num(thing.page)
                 if 'Functional' in thing['/Title']:
-                    end_page = self.get_page_num(thing.page.getObject())
+                    end_page = self.get_page_num(thing.page)
                     break
             for page_num in range(start_page, end_page):
                 page = self.pdf_file.getPage(page_num)  # type: PyPDF3.pdf.PageObject
@@ -237,6 +463,7 @@ class DataSheet:
                 if 'features and peripheral' in text:
                     table = DataSheetTableNode('Table 2. STM32F423xH features and peripheral counts', [0, 9999], 9999,
                                                page)
+                    table.page_num = page_num
                     self.fallback_table = table
                     break
         pass
@@ -260,6 +487,7 @@ class DataSheet:
                     try:
                         table_id = int(name.split('.')[0].split(' ')[-1])
                         table = DataSheetTableNode(name, [0, table_id], table_id, entry)
+                        self.bind_page(table, entry.page)
                         self.table_root.append(table)
                         if top_level_node:
                             table.path = top_level_node.path + [table_id]
@@ -278,7 +506,7 @@ class DataSheet:
 
                         node = DataSheetNode(join(tmp[1:]), order)
                         node._page = entry.page.getObject()
-                        node._page_plumber = self.plumber.pages[self.get_page_num(entry.page.getObject())]
+                        self.bind_page(node, entry.page)
                         node.parent = self.table_of_content
                         parent = node.get_node_by_path(order[:-1])
                         parent.append(node)
@@ -286,27 +514,48 @@ class DataSheet:
                         if tmp[0].isnumeric():
                             node = DataSheetNode(join(tmp[1:]), [int(tmp[0])])
                             node._page = entry.page.getObject()
-                            node._page_plumber = self.plumber.pages[self.get_page_num(entry.page.getObject())]
+                            self.bind_page(node, entry.page)
                             self.table_of_content.append(node)
                             # pos = self.recursive_create_toc([int(tmp[0])])
                             # pos['name'] = ' '.join(tmp[1:])
                         else:
                             node = DataSheetNode(name, [1])
                             node._page = entry.page.getObject()
-                            node._page_plumber = self.plumber.pages[self.get_page_num(entry.page.getObject())]
+                            self.bind_page(node, entry.page)
                             self.table_of_content.append(node)
                     top_level_node = node
 
             else:
                 pass
 
-    def get_page_num(self, page):
-        # return self.pdf_file.getPageNumber(page)
+    def build_page_index(self):
+        """Maps page object ids and page content references to page numbers."""
+        self._page_refs = {}
+        self._page_contents = {}
         for n, pdf_page in enumerate(self.pdf_file.pages):
-            if pdf_page.raw_get('/Contents') == page.raw_get('/Contents'):
-                return n
-        return -1
+            if pdf_page.indirectRef is not None:
+                self._page_refs.setdefault(pdf_page.indirectRef.idnum, n)
+            if '/Contents' in pdf_page:
+                self._page_contents.setdefault(ref_key(pdf_page.raw_get('/Contents')), n)
+
+    def get_page_num(self, page):
+        """Finds page number of page.
 
+            Args:
+                page: IndirectObject pointing to page, PageObject or resolved page dictionary.
+            Returns:
+                Page number or -1 if page is not in document.
+        """
+        if self._page_refs is None:
+            self.build_page_index()
+        if isinstance(page, IndirectObject):
+            return self._page_refs.get(page.idnum, -1)
+        indirect_ref = getattr(page, 'indirectRef', None)
+        if indirect_ref is not None:
+            return self._page_refs.get(indirect_ref.idnum, -1)
+        if '/Contents' not in page:
+            return -1
+        return self._page_contents.get(ref_key(page.raw_get('/Contents')), -1)
 
 if __name__ == '__main__':
     if len(sys.argv) < 1:
@@ -65,7 +65,7 @@ class KLFeatureListExtractor(MKFeatureListExtractor):
         mcus = []
         ordering_info = self.datasheet.table_of_content.get_node_by_name('Ordering information')
         if ordering_info:
-            or_page = self.datasheet.get_page_num(ordering_info._page)
+            or_page = ordering_info.page_num
             ordering_tables = self.extract_table(self.datasheet, or_page)
         else:
             ordering_tables = self.extract_table(self.datasheet, 1)
@@ -76,7 +76,7 @@ class KLFeatureListExtractor(MKFeatureListExtractor):
                 mcus = list(map(lambda cell: cell.clean_text, table.get_col(0)[2:]))
 
         for page in pages:
-            text = page.extract_text(y_tolerance=5)
+            text = self.datasheet.page_text(page.page_number - 1, y_tolerance=5)
             for block in text.split("€"):
                     block = block.replace('\n', ' ')
                     lines = fucking_split(block, '†‡•')
@@ -64,7 +64,7 @@ class KVFeatureListExtractor(MKFeatureListExtractor):
         mcus = []
         ordering_info = self.datasheet.table_of_content.get_node_by_name('Ordering information')
         if ordering_info:
-            or_page = self.datasheet.get_page_num(ordering_info._page)
+            or_page = ordering_info.page_num
             ordering_tables = self.extract_table(self.datasheet, or_page)
         else:
             ordering_tables = self.extract_table(self.datasheet, 1)
@@ -75,7 +75,7 @@ class KVFeatureListExtractor(MKFeatureListExtractor):
                 mcus = list(map(lambda cell: cell.clean_text, table.get_col(0)[2:]))
 
         for page in pages:
-            text = page.extract_text()
+            text = self.datasheet.page_text(page.page_number - 1)
             for block in text.split("€"):
                 block = block.replace('\n', ' ')
                 lines = fucking_split(block,'†‡°••')
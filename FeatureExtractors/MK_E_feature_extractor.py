@@ -109,9 +109,9 @@ class MKFeatureListExtractor(FeatureListExtractor):
         fields = self.datasheet.table_of_content.get_node_by_name('Fields')
         text = ''
         if fields:
-            text += self.datasheet.plumber.pages[self.datasheet.get_page_num(fields._page)].extract_text()
+            text += self.datasheet.page_text(fields.page_num)
 
-            text += self.datasheet.plumber.pages[self.datasheet.get_page_num(fields._page) + 1].extract_text()
+            text += self.datasheet.page_text(fields.page_num + 1)
         text = fucking_replace(text, '°–…‡†', '-')
         text = latin1_to_ascii(text)
         if self.package_re.findall(text):
@@ -232,7 +232,7 @@ class MKFeatureListExtractor(FeatureListExtractor):
         pages = [self.datasheet.plumber.pages[0], self.datasheet.plumber.pages[1]]
         mcus = []
         for page in pages:
-            text = page.extract_text(y_tolerance=5)
+            text = self.datasheet.page_text(page.page_number - 1, y_tolerance=5)
             for block in text.split("•"):
                 if 'Supports the following' in block:
                     mcus = [m[0] for m in self.mcu_names.findall(block)]
@@ -250,18 +250,14 @@ class MKFeatureListExtractor(FeatureListExtractor):
 
         return controller_features
 
-    def extract_pinout(self):
+    def find_pin_pages(self, start_page, raw_index=True):
         pin_pages = []
-        start = self.datasheet.table_of_content.get_node_by_name('Pinouts and Packaging')
-        if start is None:
-            start = self.datasheet.table_of_content.get_node_by_name('Pin Assignments')
-        start_page = self.datasheet.get_page_num(start._page)
         found = False
         dropped = False
         for page in tqdm(self.datasheet.plumber.pages[start_page:], desc='Scaning pages',
                          unit='pages'):  # type:pdfplumber.pdf.Page
-            page_text = page.extract_text(x_tolerance=2, y_tolerance=5)
-            if 'alt0' in page_text.lower():
+            if self.datasheet.search_page(page.page_number - 1, 'alt0', ('alt0',), raw_index=raw_index,
+                                          x_tolerance=2, y_tolerance=5):
                 found = True
                 pin_pages.append(page.page_number - 1)
                 continue
@@ -269,9 +265,17 @@ class MKFeatureListExtractor(FeatureListExtractor):
                 dropped = True
             if found and dropped:
                 break
+        return pin_pages
+
+    def extract_pinout(self):
+        start = self.datasheet.table_of_content.get_node_by_name('Pinouts and Packaging')
+        if start is None:
+            start = self.datasheet.table_of_content.get_node_by_name('Pin Assignments')
+        pin_pages = self.find_pin_pages(start.page_num)
+        if not pin_pages:  # raw text index may miss pages, scan layout text of every page
+            pin_pages = self.find_pin_pages(start.page_num, raw_index=False)
         tables = []
-        for n,page in enumerate(pin_pages):
-            table = self.extract_table(self.datasheet, page)
+        for n, table in enumerate(self.extract_page_tables(self.datasheet, pin_pages)):
             if n == 0:
                 tables.append(table[-1])
             if n+1 == len(pin_pages):
@@ -287,7 +291,7 @@ class MKFeatureListExtractor(FeatureListExtractor):
             if len(table.get_row(1))!=len(root.get_row(1)):
                 continue
             for row in list(table.global_map.values())[1:]:
-                root.global_map[len(root.global_map)] = row
+                root.append_row(row)
         packages = []
         have_pin_names = False
         for cell in root.get_row(0):
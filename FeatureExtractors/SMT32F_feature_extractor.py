@@ -23,16 +23,14 @@ class STM32FFeatureListExtractor(STM32LFeatureListExtractor):
         print('Extracting tables for', self.controller)
         datasheet = self.datasheet
         self.config_name = 'STM32F'
-        table_page = None
+        table_node = None
         for table in datasheet.table_root.childs:
             if 'features and peripheral' in table.name.lower():
-                table_page = table.page
-        if table_page is None:
-            table_page = datasheet.fallback_table.page
-        page_num = datasheet.get_page_num(table_page)
-        table_pt1 = self.extract_table(datasheet, page_num)
-        table_pt2 = self.extract_table(datasheet, page_num + 1)
-        table_pt3 = self.extract_table(datasheet, page_num + 2)
+                table_node = table
+        if table_node is None:
+            table_node = datasheet.fallback_table
+        page_num = table_node.page_num
+        table_pt1, table_pt2, table_pt3 = self.extract_page_tables(datasheet, [page_num, page_num + 1, page_num + 2])
         if table_pt1:
             self.features_tables.append(table_pt1[0])
         if table_pt2:
@@ -18,11 +18,8 @@ class STM32LFeatureListExtractor(FeatureListExtractor):
         datasheet = self.datasheet
         self.config_name = 'STM32L'
 
-        table_page = datasheet.table_root.childs[1].page
-        page_num = datasheet.get_page_num(table_page)
-        table_pt1 = self.extract_table(datasheet, page_num)
-        table_pt2 = self.extract_table(datasheet, page_num + 1)
-        table_pt3 = self.extract_table(datasheet, page_num + 2)
+        page_num = datasheet.table_root.childs[1].page_num
+        table_pt1, table_pt2, table_pt3 = self.extract_page_tables(datasheet, [page_num, page_num + 1, page_num + 2])
         if table_pt1:
             self.features_tables.append(table_pt1[0])
         if table_pt2:
@@ -151,20 +148,20 @@ class STM32LFeatureListExtractor(FeatureListExtractor):
         self.features = controller_features
         return controller_features
 
-    def extract_pinout(self):
+    def find_pin_pages(self, start_page, raw_index=True):
         pin_pages = []
-        start = self.datasheet.table_of_content.get_node_by_name('Pinouts and pin description')
-        start_page = self.datasheet.get_page_num(start._page)
         found = False
         dropped = False
         with tqdm(self.datasheet.plumber.pages[start_page:], desc='Scaning pages', unit='pages') as prog:
             for page in prog:  # type:pdfplumber.pdf.Page
-                page_text = page.extract_text(x_tolerance=2, y_tolerance=5)
-                if found and re.findall('.*pin.*definiti.*conti.*',page_text,re.IGNORECASE):
+                page_num = page.page_number - 1
+                if found and self.datasheet.search_page(page_num, '.*pin.*definiti.*conti.*', ('pin', 'definiti', 'conti'),
+                                                        raw_index=raw_index, x_tolerance=2, y_tolerance=5):
                     pin_pages.append(page.page_number - 1)
                     continue
 
-                elif not found and re.findall('.*pin.*definiti.*', page_text, re.IGNORECASE):
+                elif not found and self.datasheet.search_page(page_num, '.*pin.*definiti.*', ('pin', 'definiti'),
+                                                              raw_index=raw_index, x_tolerance=2, y_tolerance=5):
                     prog.set_description('Found first table')
                     found = True
                     pin_pages.append(page.page_number - 1)
@@ -176,9 +173,15 @@ class STM32LFeatureListExtractor(FeatureListExtractor):
                 if found and dropped:
                     prog.close()
                     break
+        return pin_pages
+
+    def extract_pinout(self):
+        start = self.datasheet.table_of_content.get_node_by_name('Pinouts and pin description')
+        pin_pages = self.find_pin_pages(start.page_num)
+        if not pin_pages:  # raw text index may miss pages, scan layout text of every page
+            pin_pages = self.find_pin_pages(start.page_num, raw_index=False)
         tables = []
-        for n,page in enumerate(pin_pages):
-            table = self.extract_table(self.datasheet, page)
+        for n, table in enumerate(self.extract_page_tables(self.datasheet, pin_pages)):
             if n == 0:
                 tables.append(table[-1])
             elif n+1 == len(pin_pages):
@@ -193,7 +196,7 @@ class STM32LFeatureListExtractor(FeatureListExtractor):
             cell.text = self.fix_name(cell.text)
         for table in tables:
             for row in list(table.global_map.values())[2:]:
-                root.global_map[len(root.global_map)] = row
+                root.append_row(row)
         # for row in root.global_map.values():
         #     print(''.join([cell.text.replace(" \n", '').replace("\n", "").center(15, ' ') for cell in row.values()]))
         pin_number_span = 0
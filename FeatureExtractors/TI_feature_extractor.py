@@ -38,7 +38,7 @@ class TIFeatureListExtractor(MKFeatureListExtractor):
     def collect_mcus(self):
         table = self.datasheet.table_of_content.get_node_by_name('Device Information')
         if table:
-            table = self.extract_table(self.datasheet, self.datasheet.get_page_num(table._page))[0]
+            table = self.extract_table(self.datasheet, table.page_num)[0]
             for row_id, row in table.global_map.items():
                 if row_id == 0:
                     if row[0].text != 'PARTNUMBER':
@@ -162,7 +162,7 @@ class TIFeatureListExtractor(MKFeatureListExtractor):
         controller_features = {}
         pages = [self.datasheet.plumber.pages[0], self.datasheet.plumber.pages[1]]
         for page in pages:
-            text = page.extract_text(y_tolerance=5, x_tolerance=2)
+            text = self.datasheet.page_text(page.page_number - 1, y_tolerance=5, x_tolerance=2)
             for block in text.split("•"):
                 block = block.replace('\n', ' ')
                 lines = fucking_split(block, '†‡°•–')
@@ -1,11 +1,12 @@
 import sys
 import traceback
+from concurrent.futures import ProcessPoolExecutor
 from pprint import pprint
 from typing import List, Dict, Any
 
 from DataSheetParsers.DataSheet import DataSheet
 from PinManager import PinManager
-from TableExtractor import TableExtractor, Table
+from TableExtractor import TableExtractor, Table, TableCache
 from Utils import is_numeric, is_dict, remove_units, replace_i, merge
 
 
@@ -72,6 +73,7 @@ def convert_type(name: str, value):
 
 
 class FeatureListExtractor:  # This class is adapted to STM
+    version = 1  # bump when extraction changes, FeatureManager re-parses datasheets with old version
 
     def fix_name(self, name):
         name = "".join([part[::-1] for part in name[::1][::-1].split('\n')])
@@ -92,28 +94,66 @@ class FeatureListExtractor:  # This class is adapted to STM
         self.config_name = 'UNKNOWN CONTROLLER'
         self.mc_family = 'UNKNOWN'
         self.pin_manager = PinManager(self.pin_data,{})
+        self.table_cache = TableCache()
+        self.page_pool = None  # type: ProcessPoolExecutor
         self.post_init()
 
     def post_init(self):
         pass
 
     def process(self):
-        self.extract_tables()
-        self.extract_features()
-        del self.features_tables
-        self.extract_pinout()
+        try:
+            self.extract_tables()
+            self.extract_features()
+            del self.features_tables
+            self.extract_pinout()
+        finally:
+            self.close_page_pool()
         return self.features
 
+    def close_page_pool(self):
+        if self.page_pool is not None:
+            self.page_pool.shutdown()
+            self.page_pool = None
+
     def extract_table(self, datasheet, page):
         print('Extracting table from {} page'.format(page + 1))
-        pdf_int = TableExtractor(str(datasheet.path))
+        table = self.table_cache.load(datasheet.sha256, page)
+        if table is not None:
+            return table
+        pdf_int = TableExtractor(datasheet)
         try:
             table = pdf_int.parse_page(page)
         except Exception as ex:
             pass
             table = None
+        else:
+            self.table_cache.save(datasheet.sha256, page, table)
         return table
 
+    def extract_page_tables(self, datasheet, pages):
+        """
+        Same as extract_table for every page.
+
+        With TableExtractor.jobs > 1 pages that aren't cached are parsed in worker processes,
+        pool is made once per datasheet and shut down at the end of process.
+        """
+        tables = {}
+        for page in pages:
+            print('Extracting table from {} page'.format(page + 1))
+            tables[page] = self.table_cache.load(datasheet.sha256, page)
+        missing = [page for page, table in tables.items() if table is None]
+        if missing:
+            extractor = TableExtractor(datasheet)
+            if self.page_pool is None and TableExtractor.jobs > 1 and len(missing) > 1:
+                self.page_pool = extractor.page_pool()
+            parsed = extractor.parse_pages(missing, skip_errors=True, executor=self.page_pool)
+            for page, table in zip(missing, parsed):
+                if table is not None:
+                    self.table_cache.save(datasheet.sha256, page, table)
+                tables[page] = table
+        return [tables[page] for page in pages]
+
     def extract_tables(self):  # OVERRIDE THIS FUNCTION FOR NEW CONTROLLER
         return
 
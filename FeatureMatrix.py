@@ -0,0 +1,105 @@
+from collections import namedtuple
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from Utils import is_dict, is_float_or_int, split_cmp_type
+
+Column = namedtuple('Column', ['values', 'numeric', 'dicts', 'present', 'truthy'])
+
+
+class FeatureMatrix:
+    """
+    Columnar view of MCU features for matching requirements.
+
+    Each feature path like ('OPERATING VOLTAGE', 'min') is compiled into NumPy column of values with masks
+    of MCUs where value is missing, numeric or nested dict. Columns are compiled when first requirement needs them
+    and reused by following queries, so requirements are evaluated as boolean masks over all MCUs at once.
+    Values which can't be compared as numbers (strings, lists) are reported as undecided,
+    caller checks these MCUs one by one.
+    """
+    OPERATORS = {
+        '>': np.greater_equal,
+        '<': np.less_equal,
+        '=': np.equal,
+    }
+
+    def __init__(self, families: Dict[str, Dict[str, Dict[str, Any]]]) -> None:
+        self.names = []  # type: List[str]
+        self.families = []  # type: List[str]
+        self.rows = []  # type: List[Dict[str, Any]]
+        for family, mcus in families.items():
+            for mcu, features in mcus.items():
+                self.families.append(family)
+                self.names.append(mcu)
+                self.rows.append(features)
+        self.columns = {}  # type: Dict[Tuple[str, ...], Column]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def column(self, path: Tuple[str, ...]) -> Column:
+        """Compiled column of value under path of keys in every MCU features."""
+        if path not in self.columns:
+            size = len(self.rows)
+            values = np.full(size, np.nan)
+            numeric, dicts, present, truthy = (np.zeros(size, dtype=bool) for _ in range(4))
+            for n, features in enumerate(self.rows):
+                value = features
+                for key in path:
+                    if not is_dict(value) or key not in value:
+                        break
+                    value = value[key]
+                else:
+                    present[n] = True
+                    truthy[n] = bool(value)
+                    if is_float_or_int(value):
+                        numeric[n] = True
+                        values[n] = value
+                    elif is_dict(value):
+                        dicts[n] = True
+            self.columns[path] = Column(values, numeric, dicts, present, truthy)
+        return self.columns[path]
+
+    def requirement_mask(self, req_name: str, req_value: Any) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Evaluates one requirement, semantics are same as in MCUHelper.compare.
+
+        Args:
+            req_name: Feature name with optional comparison suffix: > (default), < or =.
+            req_value: Required number or dict of nested requirements, any of nested requirements has to match.
+
+        Returns:
+            Mask of matching MCUs and mask of undecided MCUs, which have to be compared one by one.
+        """
+        feature, cmp_type = split_cmp_type(req_name)
+        path = (feature.upper(),)
+        column = self.column(path)
+        if is_float_or_int(req_value):
+            matched = column.numeric & self.OPERATORS.get(cmp_type, np.greater_equal)(column.values, req_value)
+            undecided = ~column.numeric
+        elif is_dict(req_value):
+            matched, undecided = self._dict_mask(path, req_value)
+            undecided |= ~column.dicts
+        else:
+            matched = np.zeros(len(self), dtype=bool)
+            undecided = np.ones(len(self), dtype=bool)
+        return matched & column.truthy, undecided & column.truthy & ~matched
+
+    def _dict_mask(self, path: Tuple[str, ...], requirements: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+        matched = np.zeros(len(self), dtype=bool)
+        undecided = np.zeros(len(self), dtype=bool)
+        for req_name, req_value in requirements.items():
+            name, cmp_type = split_cmp_type(req_name)
+            column = self.column(path + (name,))
+            if is_float_or_int(req_value):
+                matched |= column.numeric & self.OPERATORS.get(cmp_type, np.greater_equal)(column.values, req_value)
+                undecided |= column.present & ~column.numeric
+            elif is_dict(req_value):
+                sub_matched, sub_undecided = self._dict_mask(path + (name,), req_value)
+                matched |= sub_matched
+                undecided |= sub_undecided | (column.present & ~column.dicts)
+            else:
+                undecided |= column.present
+        dicts = self.column(path).dicts
+        return matched & dicts, undecided & dicts & ~matched
@@ -0,0 +1,289 @@
+import copy
+import hashlib
+import json
+import sqlite3
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Any, Dict, List, Set
+
+from Utils import dump_json_atomic
+
+
+class FeatureStore:
+    """
+    SQLite storage of extracted MCU features.
+
+    Every feature is a row of (MCU, name, JSON encoded value). Pinouts are kept apart from features,
+    each distinct pinout is stored once under hash of it's content and MCUs reference it per package.
+    Rows keep insertion order, so loaded data has same layout and order as mcu_cache.json,
+    except PINOUT feature, which is loaded after all other features when pinouts are requested.
+    """
+    SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS families (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    );
+    CREATE TABLE IF NOT EXISTS mcus (
+        id INTEGER PRIMARY KEY,
+        family_id INTEGER NOT NULL REFERENCES families (id) ON DELETE CASCADE,
+        name TEXT NOT NULL,
+        UNIQUE (family_id, name)
+    );
+    CREATE TABLE IF NOT EXISTS features (
+        mcu_id INTEGER NOT NULL REFERENCES mcus (id) ON DELETE CASCADE,
+        name TEXT NOT NULL,
+        value TEXT NOT NULL,
+        UNIQUE (mcu_id, name)
+    );
+    CREATE TABLE IF NOT EXISTS pinout_data (
+        id INTEGER PRIMARY KEY,
+        hash TEXT NOT NULL UNIQUE,
+        data TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS mcu_pinouts (
+        mcu_id INTEGER NOT NULL REFERENCES mcus (id) ON DELETE CASCADE,
+        package TEXT NOT NULL,
+        pinout_id INTEGER NOT NULL REFERENCES pinout_data (id),
+        UNIQUE (mcu_id, package)
+    );
+    CREATE INDEX IF NOT EXISTS mcus_family ON mcus (family_id);
+    CREATE INDEX IF NOT EXISTS features_name ON features (name);
+    CREATE INDEX IF NOT EXISTS mcu_pinouts_pinout ON mcu_pinouts (pinout_id);
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    );
+    '''
+
+    def __init__(self, path) -> None:
+        """
+        Constructor of FeatureStore class.
+
+        Args:
+            path: Path to SQLite database, it's created if it doesn't exist.
+
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.mtime = self.path.stat().st_mtime if self.path.exists() else None  # before schema changes touch file
+        self.db = sqlite3.connect(str(self.path))
+        self.db.execute('PRAGMA foreign_keys = ON')
+        self.db.executescript(self.SCHEMA)
+        if self.db.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'pinouts'").fetchone():
+            self._migrate_pinouts()
+
+    def _migrate_pinouts(self):
+        """Moves pinouts from per MCU table of older stores to shared pinout storage."""
+        with self.db:
+            for mcu_id, package, data in self.db.execute('SELECT mcu_id, package, data FROM pinouts '
+                                                         'ORDER BY rowid').fetchall():
+                self._link_pinout(mcu_id, package, data)
+            self.db.execute('DROP TABLE pinouts')
+
+    def close(self):
+        self.db.close()
+
+    def get_meta(self, key: str) -> str:
+        row = self.db.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        with self.db:
+            self.db.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    def is_empty(self) -> bool:
+        return self.db.execute('SELECT 1 FROM families LIMIT 1').fetchone() is None
+
+    def families(self) -> List[str]:
+        return [name for name, in self.db.execute('SELECT name FROM families ORDER BY id')]
+
+    def mcu_names(self) -> Dict[str, List[str]]:
+        """Names of MCUs grouped by family, features aren't loaded."""
+        names = {family: [] for family in self.families()}
+        for family, mcu in self.db.execute('SELECT families.name, mcus.name FROM mcus '
+                                           'JOIN families ON families.id = mcus.family_id '
+                                           'ORDER BY families.id, mcus.id'):
+            names[family].append(mcu)
+        return names
+
+    def feature_names(self) -> Dict[str, Set[str]]:
+        """Names of features any MCU of family has, grouped by family, values aren't loaded."""
+        names = {family: set() for family in self.families()}
+        for family, name in self.db.execute('SELECT DISTINCT families.name, features.name FROM features '
+                                            'JOIN mcus ON mcus.id = features.mcu_id '
+                                            'JOIN families ON families.id = mcus.family_id'):
+            names[family].add(name)
+        return names
+
+    def load(self, family: str = None, pinouts=False) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Loads features in mcu_cache.json layout.
+
+        Args:
+            family: Load only this family, all families are loaded by default.
+            pinouts: Also load pinouts into PINOUT feature of every MCU that has them.
+
+        Returns:
+            Dict of families, each one is dict of MCU features.
+        """
+        families = self.families()
+        if family:
+            if family not in families:
+                return {}
+            families = [family]
+        where, params = ('WHERE families.name = ?', (family,)) if family else ('', ())
+        result = {name: {} for name in families}  # type: Dict[str, Dict[str, Dict[str, Any]]]
+        for family_name, mcu_name, name, value in self.db.execute(
+                'SELECT families.name, mcus.name, features.name, features.value FROM mcus '
+                'JOIN families ON families.id = mcus.family_id '
+                'LEFT JOIN features ON features.mcu_id = mcus.id {} '
+                'ORDER BY mcus.id, features.rowid'.format(where), params):
+            mcu = result[family_name].setdefault(mcu_name, {})
+            if name is not None:
+                mcu[name] = json.loads(value)
+        if not pinouts:
+            return result
+        for family_name, mcu_name, package, data in self.db.execute(
+                'SELECT families.name, mcus.name, mcu_pinouts.package, pinout_data.data FROM mcu_pinouts '
+                'JOIN pinout_data ON pinout_data.id = mcu_pinouts.pinout_id '
+                'JOIN mcus ON mcus.id = mcu_pinouts.mcu_id '
+                'JOIN families ON families.id = mcus.family_id {} '
+                'ORDER BY mcu_pinouts.rowid'.format(where), params):
+            result[family_name][mcu_name].setdefault('PINOUT', {})[package] = json.loads(data)
+        return result
+
+    def load_pinouts(self, family: str, mcu: str) -> Dict[str, Any]:
+        """Pinouts of MCU by package, empty dict if MCU has no stored pinouts."""
+        rows = self.db.execute('SELECT mcu_pinouts.package, pinout_data.data FROM mcu_pinouts '
+                               'JOIN pinout_data ON pinout_data.id = mcu_pinouts.pinout_id '
+                               'JOIN mcus ON mcus.id = mcu_pinouts.mcu_id '
+                               'JOIN families ON families.id = mcus.family_id '
+                               'WHERE families.name = ? AND mcus.name = ? '
+                               'ORDER BY mcu_pinouts.rowid', (family, mcu))
+        return {package: json.loads(data) for package, data in rows}
+
+    def save(self, families: Dict[str, Dict[str, Dict[str, Any]]], keep_pinouts=True):
+        """
+        Replaces stored families with given ones in one transaction, other families aren't touched.
+
+        Args:
+            families: Families in mcu_cache.json layout.
+            keep_pinouts: MCUs without PINOUT feature keep their stored pinouts,
+                so families loaded without pinouts can be saved back.
+        """
+        with self.db:
+            for family, mcus in families.items():
+                self._write_family(family, mcus, keep_pinouts)
+            self._drop_unused_pinouts()
+
+    def update(self, families: Dict[str, Dict[str, Dict[str, Any]]]):
+        """
+        Replaces or adds given MCUs in one transaction, other MCUs of their families are kept.
+
+        MCUs are replaced whole, pinouts of MCUs without PINOUT feature are removed.
+        """
+        with self.db:
+            for family, mcus in families.items():
+                family_id = self._family_id(family)
+                for mcu, features in mcus.items():
+                    self._write_mcu(family_id, mcu, features)
+            self._drop_unused_pinouts()
+
+    def _family_id(self, family: str) -> int:
+        self.db.execute('INSERT OR IGNORE INTO families (name) VALUES (?)', (family,))
+        family_id, = self.db.execute('SELECT id FROM families WHERE name = ?', (family,)).fetchone()
+        return family_id
+
+    def _write_family(self, family: str, mcus: Dict[str, Dict[str, Any]], keep_pinouts: bool):
+        family_id = self._family_id(family)
+        stored = self.db.execute('SELECT id, name FROM mcus WHERE family_id = ?', (family_id,)).fetchall()
+        self.db.executemany('DELETE FROM mcus WHERE id = ?',
+                            [(mcu_id,) for mcu_id, name in stored if name not in mcus])
+        for mcu, features in mcus.items():
+            self._write_mcu(family_id, mcu, features, keep_pinouts)
+
+    def _write_mcu(self, family_id: int, mcu: str, features: Dict[str, Any], keep_pinouts=False):
+        row = self.db.execute('SELECT id FROM mcus WHERE family_id = ? AND name = ?', (family_id, mcu)).fetchone()
+        if row:  # existing MCU keeps it's id, so it keeps it's position in family
+            mcu_id, = row
+            self.db.execute('DELETE FROM features WHERE mcu_id = ?', (mcu_id,))
+            if 'PINOUT' in features or not keep_pinouts:
+                self.db.execute('DELETE FROM mcu_pinouts WHERE mcu_id = ?', (mcu_id,))
+        else:
+            mcu_id = self.db.execute('INSERT INTO mcus (family_id, name) VALUES (?, ?)', (family_id, mcu)).lastrowid
+        self.db.executemany('INSERT INTO features (mcu_id, name, value) VALUES (?, ?, ?)',
+                            [(mcu_id, name, json.dumps(value)) for name, value in features.items()
+                             if name != 'PINOUT'])
+        for package, pinout in features.get('PINOUT', {}).items():
+            self._link_pinout(mcu_id, package, json.dumps(pinout))
+
+    def _link_pinout(self, mcu_id: int, package: str, data: str):
+        digest = hashlib.sha256(data.encode()).hexdigest()
+        self.db.execute('INSERT OR IGNORE INTO pinout_data (hash, data) VALUES (?, ?)', (digest, data))
+        pinout_id, = self.db.execute('SELECT id FROM pinout_data WHERE hash = ?', (digest,)).fetchone()
+        self.db.execute('INSERT OR REPLACE INTO mcu_pinouts (mcu_id, package, pinout_id) VALUES (?, ?, ?)',
+                        (mcu_id, package, pinout_id))
+
+    def _drop_unused_pinouts(self):
+        self.db.execute('DELETE FROM pinout_data WHERE id NOT IN (SELECT pinout_id FROM mcu_pinouts)')
+
+    def import_json(self, path):
+        """Imports families from file in mcu_cache.json layout, pinouts of MCUs are replaced too."""
+        with Path(path).open('r') as fp:
+            self.save(json.load(fp), keep_pinouts=False)
+
+    def export_json(self, path):
+        """Exports all families to file in mcu_cache.json layout."""
+        dump_json_atomic(self.load(pinouts=True), path, indent=1)
+
+
+class FamilyMapping(MutableMapping):
+    """
+    Dict-like view of stored families, family's MCUs are loaded from store when family is accessed first time.
+
+    Names of families are read from store on creation, so membership checks and iteration over names are cheap.
+    Assigned families are kept in memory until FeatureManager saves them.
+    """
+
+    def __init__(self, store: FeatureStore) -> None:
+        self.store = store
+        self.names = store.families()  # type: List[str]
+        self.loaded = {}  # type: Dict[str, Dict[str, Dict[str, Any]]]
+
+    def __getitem__(self, family: str) -> Dict[str, Dict[str, Any]]:
+        if family not in self.loaded:
+            if family not in self.names:
+                raise KeyError(family)
+            self.loaded[family] = self.store.load(family)[family]
+        return self.loaded[family]
+
+    def __setitem__(self, family: str, mcus: Dict[str, Dict[str, Any]]):
+        if family not in self.names:
+            self.names.append(family)
+        self.loaded[family] = mcus
+
+    def __delitem__(self, family: str):
+        if family not in self.names:
+            raise KeyError(family)
+        self.names.remove(family)
+        self.loaded.pop(family, None)
+
+    def __contains__(self, family):
+        return family in self.names
+
+    def __iter__(self):
+        return iter(list(self.names))
+
+    def __len__(self):
+        return len(self.names)
+
+    def __repr__(self):
+        return '<{} {} families, {} loaded>'.format(self.__class__.__name__, len(self.names), len(self.loaded))
+
+    def copy(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Plain dict with all families, they are loaded if needed."""
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(dict(self), memo)
+
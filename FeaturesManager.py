@@ -1,10 +1,14 @@
 import copy
+import hashlib
+import itertools
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Any
 import json
 from DataSheetManager import DataSheetManager
+from FeatureStore import FeatureStore, FamilyMapping
 from FeatureExtractors.MK_E_feature_extractor import MKFeatureListExtractor
 from FeatureExtractors.KL_E_feature_extractor import KLFeatureListExtractor
 from FeatureExtractors.KV_E_feature_extractor import KVFeatureListExtractor
@@ -16,6 +20,8 @@ import xlsxwriter
 
 from FeatureExtractors.TI_feature_extractor import TIFeatureListExtractor
 from PinManager import PinManager
+from Utils import dump_json_atomic
+from TableExtractor import TableExtractor
 
 
 class FeatureManager:
@@ -30,7 +36,9 @@ class FeatureManager:
         'CC': TIFeatureListExtractor,
     }
 
-    cache_path = Path(r'./cache/mcu_cache.json').absolute()
+    cache_path = Path(r'./cache/mcu_cache.json').absolute()  # JSON layout, imported into store on first run
+    store_path = Path(r'./cache/features.db').absolute()
+    fingerprints_path = Path(r'./cache/fingerprints.json').absolute()
 
     def __init__(self, datasheets: List[str]) -> None:
         self.config = {}  # type: Dict[str,Any]
@@ -41,36 +49,105 @@ class FeatureManager:
                 fp.seek(0)
                 self.config = json.load(fp)
         self.datasheets = datasheets
-        self.mcs_features = {}  # type: Dict[str,Any]
+        self.mcs_features = {}  # type: FamilyMapping
         self.same_features = []  # type: List[Any]
+        self.fingerprints = {}  # type: Dict[str,Dict[str,Any]]
+        self.changed = {}  # type: Dict[str,Dict[str,None]]  # ordered set, keeps extraction order of new MCUs
+        self.store = FeatureStore(self.store_path)
         self.load_cache()
         self.datasheet_manager = DataSheetManager(datasheets)
 
-    def get_extractor(self, mc: str):
-        for extractor_name in sorted(self.EXTRACTORS, key=lambda l: len(l), reverse=True):
+    @classmethod
+    def get_extractor(cls, mc: str):
+        for extractor_name in sorted(cls.EXTRACTORS, key=lambda l: len(l), reverse=True):
             if extractor_name.upper() in mc.upper():
-                return self.EXTRACTORS[extractor_name]
+                return cls.EXTRACTORS[extractor_name]
+
+    @classmethod
+    def extract_features(cls, mc: str, datasheet, config: Dict[str, Any]):
+        """Extracts and unifies features of mc, returns MCU family name and features."""
+        print('WORKING ON', mc)
+        extractor = cls.get_extractor(mc)
+        if datasheet and extractor:
+            extractor_obj = extractor(mc, datasheet, config)
+            extractor_obj.process()
+            extractor_obj.unify_names()
+            return extractor_obj.mc_family, extractor_obj.features
+        else:
+            raise Exception('Can\' find {} in database'.format(mc))
+
+    def extract_datasheet(self, mc: str):
+        """Loads datasheet of mc, extracts it's features and releases datasheet, so only one is kept in memory."""
+        self.datasheet_manager.get_or_download([mc])
+        try:
+            return self.extract_features(mc, self.datasheet_manager[mc], self.config)
+        finally:
+            self.datasheet_manager.release(mc)
+
+    def fingerprint(self, mc: str):
+        """Fingerprint of everything features of mc are extracted from, None if datasheet isn't downloaded yet."""
+        path = self.datasheet_manager.get_path(mc)
+        extractor = self.get_extractor(mc)
+        if not path or not path.exists() or not extractor:
+            return None
+        stat = path.stat()
+        old = self.fingerprints.get(mc.upper(), {})
+        if old.get('mtime') == stat.st_mtime and old.get('size') == stat.st_size:
+            sha256 = old['sha256']  # file wasn't touched, no need to hash it again
+        else:
+            sha256 = hashlib.sha256(path.read_bytes()).hexdigest()
+        config = {'corrections': self.config['corrections'],
+                  'unify': self.config['unify'].get(self.get_config_name(mc), {})}
+        return {
+            'sha256': sha256,
+            'mtime': stat.st_mtime,
+            'size': stat.st_size,
+            'extractor': '{}.{}'.format(extractor.__module__, extractor.__name__),
+            'version': [extractor.version, TableExtractor.version],
+            'config': hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest(),
+        }
 
-    def parse(self):
-        self.datasheet_manager.get_or_download()
+    def is_parsed(self, mc: str, fingerprint) -> bool:
+        """Checks if cached features of mc were extracted from same datasheet, extractor and config."""
+        old = self.fingerprints.get(mc.upper())
+        if not fingerprint or not old or old.get('family') not in self.mcs_features:
+            return False
+        return all(old.get(key) == fingerprint[key] for key in ('sha256', 'extractor', 'version', 'config'))
+
+    def parse(self, force=False, jobs=1):
+        """Extracts features of changed datasheets, features of unchanged ones are kept from cache.
+
+        With jobs > 1 datasheets are parsed in that many worker processes,
+        results are merged in same order as in sequential parsing.
+        """
+        fingerprints = {}
         for mc in self.datasheets:
+            fingerprint = self.fingerprint(mc)
+            if not force and self.is_parsed(mc, fingerprint):
+                print('SKIPPING UNCHANGED', mc)
+                self.fingerprints[mc.upper()].update(mtime=fingerprint['mtime'], size=fingerprint['size'])
+                continue
+            fingerprints[mc] = fingerprint
+        for mc in fingerprints:
             config = self.get_config_name(mc)
             if not self.config['unify'].get(config,False):
                 self.config['unify'][config] = {}
-            print('WORKING ON', mc)
-            extractor = self.get_extractor(mc)
-            datasheet = self.datasheet_manager[mc]
-            if datasheet and extractor:
-                extractor_obj = extractor(mc, datasheet, self.config)
-                extractor_obj.process()
-                extractor_obj.unify_names()
-                if self.mcs_features.get(extractor_obj.mc_family, False):
-                    self.mcs_features[extractor_obj.mc_family].update(extractor_obj.features)
-                else:
-                    self.mcs_features[extractor_obj.mc_family] = extractor_obj.features
-                pass  # handle feature extraction
+        if jobs > 1:
+            self.datasheet_manager.get_or_download(list(fingerprints), load=False)
+            with ProcessPoolExecutor(jobs) as executor:
+                results = list(executor.map(extract_datasheet_features, fingerprints, itertools.repeat(self.config)))
+        else:
+            results = map(self.extract_datasheet, fingerprints)
+        for mc, (mc_family, features) in zip(fingerprints, results):
+            if self.mcs_features.get(mc_family, False):
+                self.mcs_features[mc_family].update(features)
             else:
-                raise Exception('Can\' find {} in database'.format(mc))
+                self.mcs_features[mc_family] = features
+            self.changed.setdefault(mc_family, {}).update(dict.fromkeys(features))
+            fingerprint = fingerprints[mc] or self.fingerprint(mc)  # datasheet was just downloaded
+            if fingerprint:
+                fingerprint['family'] = mc_family
+                self.fingerprints[mc.upper()] = fingerprint
         self.save()
 
 
@@ -83,21 +160,58 @@ class FeatureManager:
         return None
 
     def load_cache(self):
-        if not self.cache_path.exists():
-            self.cache_path.parent.mkdir(exist_ok=True)
-            self.mcs_features = {}
-            return
-        with self.cache_path.open('r+') as fp:
-            new = json.load(fp)  # type: Dict
-        self.mcs_features.update(new)
-
-    def save(self):
         if self.cache_path.exists():
-            with self.cache_path.open('r+') as fp:
-                old = json.load(fp)  # type: Dict
-            old.update(self.mcs_features)
-        with self.cache_path.open('w') as fp:
-            json.dump(self.mcs_features, fp, indent=1)
+            digest = self.cache_digest()
+            imported = self.store.get_meta('mcu_cache_sha256')
+            if imported != digest:
+                if self.store.is_empty():
+                    self.store.import_json(self.cache_path)  # migrating from JSON cache
+                elif imported is not None or self.cache_path.stat().st_mtime > self.store.mtime:
+                    # JSON was updated (e.g. by git pull) after it was imported, no hash is recorded in older stores
+                    print('{} was changed, importing it into {}'.format(self.cache_path, self.store.path.name))
+                    self.store.import_json(self.cache_path)
+                self.store.set_meta('mcu_cache_sha256', digest)
+        self.mcs_features = FamilyMapping(self.store)  # families are loaded on first access
+        if self.fingerprints_path.exists():
+            with self.fingerprints_path.open('r') as fp:
+                self.fingerprints = json.load(fp)
+
+    def save(self, families: List[str] = None):
+        """
+        Saves MCUs changed by parse, store writes are transactions so interrupted save keeps old data.
+
+        Args:
+            families: Names of families that were changed in other way, they are saved whole.
+        """
+        if families is not None:
+            self.store.save({family: self.mcs_features[family] for family in families})
+        self.store.update({family: {mcu: self.mcs_features[family][mcu] for mcu in mcus}
+                           for family, mcus in self.changed.items()})
+        self.changed.clear()
+        dump_json_atomic(self.fingerprints, self.fingerprints_path, indent=1)
+
+    def get_pinout(self, family: str, mcu: str) -> Dict[str, Any]:
+        """Pinouts of mcu by package, pinouts aren't loaded with features, so they are read from store on demand."""
+        features = self.mcs_features.get(family, {}).get(mcu, {})
+        if 'PINOUT' in features:  # parsed in this run
+            return features['PINOUT']
+        return self.store.load_pinouts(family, mcu)
+
+    def cache_digest(self):
+        return hashlib.sha256(self.cache_path.read_bytes()).hexdigest()
+
+    def export_cache(self, path=None):
+        """Exports stored features to JSON file in mcu_cache.json layout."""
+        self.store.export_json(path or self.cache_path)
+        if path is None:  # own export isn't imported again on next start
+            self.store.set_meta('mcu_cache_sha256', self.cache_digest())
+
+    def import_cache(self, path=None):
+        """Imports features from JSON file in mcu_cache.json layout, stored families with same names are replaced."""
+        self.store.import_json(path or self.cache_path)
+        if path is None:
+            self.store.set_meta('mcu_cache_sha256', self.cache_digest())
+        self.mcs_features = FamilyMapping(self.store)
 
     def collect_same_features(self):
         same_features = set()
@@ -158,6 +272,17 @@ class FeatureManager:
         excel.close()
 
 
+def extract_datasheet_features(mc: str, config: Dict[str, Any]):
+    """Worker of FeatureManager.parse, loads it's own datasheet of mc and extracts it's features."""
+    TableExtractor.jobs = 1  # datasheets are already parsed in parallel
+    datasheet_manager = DataSheetManager([mc])
+    datasheet_manager.get_or_download()
+    try:
+        return FeatureManager.extract_features(mc, datasheet_manager[mc], config)
+    finally:
+        datasheet_manager.release(mc)  # worker process is reused for next datasheets
+
+
 if __name__ == '__main__':
     import json
 
@@ -170,6 +295,6 @@ if __name__ == '__main__':
     feature_manager.parse()
     feature_manager.write_excel_file()
     with open('features.json', 'w') as fp:
-        json.dump(feature_manager.mcs_features, fp, indent=2)
+        json.dump(feature_manager.mcs_features.copy(), fp, indent=2)
     # KL17P64M48SF6 stm32L451 MK11DN512AVMC5
     a = 5
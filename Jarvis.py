@@ -6,14 +6,17 @@ import sys
 import traceback
 from pathlib import Path
 from random import randint,choice
-from typing import Dict, Any
+from typing import Dict, Any, List
 
+import numpy as np
 import xlsxwriter
 
 from DataSheetManager import DataSheetManager
+from FeatureMatrix import FeatureMatrix
 from FeaturesManager import FeatureManager
 from FeatureExtractors.feature_extractor import convert_type
 from PinManager import PinManager
+from TableExtractor import TableExtractor
 from Utils import *
 
 
@@ -26,6 +29,7 @@ class MCUHelper:
         controllers = sys.argv[2:]
         self.feature_manager = FeatureManager(controllers)
         self.mcu_features = self.feature_manager.mcs_features
+        self.feature_matrix = None  # type: FeatureMatrix
 
     @staticmethod
     def match(required_value, feature_value, cmp_type, ):
@@ -46,13 +50,7 @@ class MCUHelper:
 
     @staticmethod
     def get_cmp_type(name):
-        if name[-1] in '<>=':
-            feature_name = name[:-1]
-            cmp_type = name[-1]
-        else:
-            feature_name = name
-            cmp_type = '>'
-        return feature_name, cmp_type
+        return split_cmp_type(name)
 
     def compare(self, req_name, req_value, feature_name, feature_value):
         match = False
@@ -88,34 +86,32 @@ class MCUHelper:
         print(req_value,feature_value)
         # raise NotImplementedError('UNEXPECTED req_value or feature_value types!')
 
+    def compare_mcu(self, req_name, req_value, mcu_name, mcu_features):
+        req_feature, cmp_type = self.get_cmp_type(req_name)
+        feature_value = mcu_features.get(req_feature.upper(), None)
+        try:
+            return bool(self.compare(req_name, req_value, req_feature, feature_value))
+        except Exception as ex:
+            print('ERROR:', ex)
+            print('INFO:', req_name, ':', req_value)
+            print('INFO2:', mcu_name, ':', feature_value)
+            traceback.print_exc()
+            return False
+
     def collect_matching(self):
         self.print_user_req()
         print('Searching for matching microcontrolers!')
-        for mcu_family, mcus in self.mcu_features.items():
-            for mcu_name, mcu_features in mcus.items():
-                matched = True
-                for req_name, req_value in self.required_feature.items():
-                    if not matched:
-                        break
-                    req_feature, cmp_type = self.get_cmp_type(req_name)
-                    feature_value = mcu_features.get(req_feature.upper(), None)
-                    if feature_value:
-                        try:
-                            matched &= self.compare(req_name, req_value, req_feature, feature_value)
-                            # else:
-                            #     matched &= self.match(req_value, feature_value, cmp_type)
-
-                        except Exception as ex:
-                            matched = False
-                            print('ERROR:', ex)
-                            print('INFO:', req_name, ':', req_value)
-                            print('INFO2:', mcu_name, ':', feature_value)
-                            traceback.print_exc()
-                    else:
-                        matched = False
-                        break
-                if matched:
-                    self.matching[mcu_name] = mcu_features
+        if self.feature_matrix is None:
+            self.feature_matrix = FeatureMatrix(self.mcu_features)
+        matrix = self.feature_matrix
+        candidates = np.ones(len(matrix), dtype=bool)
+        for req_name, req_value in self.required_feature.items():
+            matched, undecided = matrix.requirement_mask(req_name, req_value)
+            for n in np.flatnonzero(undecided & candidates):  # strings, lists and other non-numeric values
+                matched[n] = self.compare_mcu(req_name, req_value, matrix.names[n], matrix.rows[n])
+            candidates &= matched
+        for n in np.flatnonzero(candidates):
+            self.matching[matrix.names[n]] = matrix.rows[n]
 
         print('Found {} matching'.format(len(self.matching)))
         print('Matching microcontrolers:')
@@ -203,7 +199,7 @@ class MCUHelper:
 datasheets_path = Path('./datasheets/').absolute()
 
 
-def parse_all():
+def parse_all(jobs=1):
     to_parse = []
     if datasheets_path.exists():
         for folder in datasheets_path.iterdir():
@@ -211,7 +207,7 @@ def parse_all():
                 for ds in folder.iterdir():
                     if ds.is_file():
                         to_parse.append(ds.stem)
-        FeatureManager(to_parse).parse()
+        FeatureManager(to_parse).parse(jobs=jobs)
     else:
         print('NO DATASHEETS FOUND')
 
@@ -252,7 +248,7 @@ def reunify_cache():
         for unknown_feature in unknown_names:
             print('\t', unknown_feature)
         print('=' * 20)
-    feature_manager.save()
+    feature_manager.save(list(feature_manager.mcs_features))
 
 
 def fit_pins(mcus, req_path):
@@ -267,9 +263,9 @@ def fit_pins(mcus, req_path):
             mcus = feature_manager.mcs_features[fam]
             for mcu_ in mcus:
                 if mcu in mcu_:
-                    mcu_data = mcus[mcu_]
-                    if 'PINOUT' in mcu_data:
-                        pin_manager = PinManager(mcu_data['PINOUT'], reqs)
+                    pinout = feature_manager.get_pinout(fam, mcu_)
+                    if pinout:
+                        pin_manager = PinManager(pinout, reqs)
                         pin_manager.read_pins()
                         pin_manager.fit_pins()
                         pin_manager.report()
@@ -288,12 +284,8 @@ def dump_unknown():
     feature_manager = FeatureManager([])
     config = feature_manager.config
     all_features = {}
-    for mc_family, mcus in feature_manager.mcs_features.items():
+    for mc_family, family_features in feature_manager.store.feature_names().items():  # features aren't loaded
         mc_family = feature_manager.get_config_name(mc_family)
-        family_features = []
-        for mc, features in mcus.items():
-            family_features.extend(list(features.keys()))
-        family_features = set(family_features)
         all_features[mc_family] = family_features
     unify = config['unify']
     with open('unknown.txt', 'w') as fp:
@@ -315,8 +307,8 @@ def find():
     feature_manager = FeatureManager([])
     closest = []
     to_find = sys.argv[2]
-    for _, mcus in feature_manager.mcs_features.items():
-        for mcu in mcus.keys():
+    for _, mcus in feature_manager.store.mcu_names().items():
+        for mcu in mcus:
             match = 0
             for m_char, u_char in zip(mcu.upper(), to_find.upper()):
                 if m_char == u_char:
@@ -384,8 +376,8 @@ def func_help():
     to_parse.append('STM32F217ZE')
     all_mcus = []
     feature_manager = FeatureManager([])
-    for mcus in feature_manager.mcs_features.values():
-        all_mcus.extend(mcus.keys())
+    for mcus in feature_manager.store.mcu_names().values():
+        all_mcus.extend(mcus)
     all_mcus.append('STM32F217Ix')
     random_datasheet = choice(to_parse)
     random_mcu = choice(all_mcus)
@@ -411,12 +403,29 @@ def func_help():
         print('\t     OR')
         print('\t    "PINS": 5 -- int, number of pin used by this module, usefull for GPIO')
 
+def pop_jobs(args: List[str], option='--jobs'):
+    """Removes "OPTION N" from args, returns N, 1 if option wasn't given or None if N isn't valid."""
+    if option not in args:
+        return 1
+    n = args.index(option)
+    value = args[n + 1] if n + 1 < len(args) else ''
+    del args[n:n + 2]
+    if not value.isdigit() or int(value) < 1:
+        print(option, 'expects positive number of processes, got', repr(value))
+        return None
+    return int(value)
+
+
 def print_usage():
     print('USAGE: {} [COMMAND]'.format(sys.argv[0]))
     print('\tdownload [MCU NAME HERE] - downloads and parses new datasheet')
+    print('\t  --jobs N - parse, download: parses datasheets in N processes')
+    print('\t  --page-jobs N - parse, download: parses table pages of each datasheet in N processes')
     print('\tfilter [NAME.json]- filters MCUs by rules in NAME.json')
     print('\tfit-pins [MCU NAME HERE] [NAME.json]- tries to fit required pins into selected MCU')
     print('\tdump_cache - prints all MCUs in cache')
+    print('\texport_cache [NAME.json] - exports cache to JSON file, cache/mcu_cache.json by default')
+    print('\timport_cache [NAME.json] - imports JSON file exported by export_cache')
     print('\tre-unify - tries to re-unify everything')
     print('\tparse - re-parses all datasheets')
     print('\tshow - opens datasheet')
@@ -432,9 +441,14 @@ if __name__ == '__main__':
     #     print('Мужчина вы что не видите, у нас обед')
     #     exit()
 
-    if len(sys.argv) > 1:
+    jobs = pop_jobs(sys.argv)
+    page_jobs = pop_jobs(sys.argv, '--page-jobs')
+    if jobs is None or page_jobs is None:
+        print_usage()
+    elif len(sys.argv) > 1:
+        TableExtractor.jobs = page_jobs
         if sys.argv[1] == 'parse':
-            parse_all()
+            parse_all(jobs)
             exit(0xDEADBEEF)
         if sys.argv[1] == 'show':
             print(str(sys.argv[2:]))
@@ -444,7 +458,7 @@ if __name__ == '__main__':
             exit(0xDEADBEEF)
         elif sys.argv[1] == 'download':
             feature_manager = FeatureManager(sys.argv[2:])
-            feature_manager.parse()
+            feature_manager.parse(jobs=jobs)
             exit(0xDEADCAFE)
         elif sys.argv[1] == 're-unify':
             reunify_cache()
@@ -453,13 +467,17 @@ if __name__ == '__main__':
             feature_manager = FeatureManager([])
             with open('./dump.txt', 'w') as fp:
                 print('DUMPING ALL KNOWN MCU\'s')
-                for family_name, family_mcus in feature_manager.mcs_features.items():
+                for family_name, family_mcus in feature_manager.store.mcu_names().items():
                     fp.write(family_name + ' :\n')
                     print(family_name, ':')
-                    for mcu_name in family_mcus.keys():
+                    for mcu_name in family_mcus:
                         fp.write('\t' + mcu_name + '\n')
                         print('\t', mcu_name)
 
+        elif sys.argv[1] == 'export_cache':
+            FeatureManager([]).export_cache(sys.argv[2] if len(sys.argv) > 2 else None)
+        elif sys.argv[1] == 'import_cache':
+            FeatureManager([]).import_cache(sys.argv[2] if len(sys.argv) > 2 else None)
         elif sys.argv[1] == 'filter':
             MCUHelper(sys.argv[2]).collect_matching().write_excel()
         elif sys.argv[1] == 'fit-pins':
@@ -1,6 +1,13 @@
+import bisect
+import hashlib
+import heapq
+import itertools
+import json
 import math
+from concurrent.futures import ProcessPoolExecutor
 from operator import itemgetter
 
+import numpy as np
 import pdfplumber
 from PIL import ImageDraw, ImageFont, Image
 from pdfplumber.table import TableFinder
@@ -13,6 +20,8 @@ def almost_equals(num1, num2, precision=5.0):
 
 
 class Point:
+    __slots__ = ('x', 'y', 'down', 'up', 'left', 'right')
+
     r = 4
     hr = r / 2
     tail = 5
@@ -80,12 +89,16 @@ class Point:
             canvas.line(((self.x, self.y), (self.x + self.tail, self.y)), 'blue')
 
     def points_to_right(self, other_points: List['Point']):
+        if isinstance(other_points, PointIndex):
+            return other_points.points_to_right(self)
         sorted_other_points = sorted(other_points, key=lambda other: other.x)
         filtered_other_points = filter(lambda o: almost_equals(o.y, self.y) and o != self and o.x > self.x,
                                        sorted_other_points)
         return list(filtered_other_points)
 
     def points_below(self, other_points: List['Point']):
+        if isinstance(other_points, PointIndex):
+            return other_points.points_below(self)
         sorted_other_points = sorted(other_points, key=lambda other: other.y)
         filtered_other_points = filter(lambda o: almost_equals(o.x, self.x) and o != self and o.y > self.y,
                                        sorted_other_points)
@@ -149,16 +162,68 @@ class Point:
         self.left |= other.left
         self.right |= other.right
 
-    def __eq__(self, other: 'Point'):
-        if not almost_equals(self.x, other.x):
-            return False
-        return almost_equals(self.y, other.y)
+    precision = 5.0
+
+    @property
+    def key(self):
+        """Coordinates snapped to tolerance grid."""
+        return math.floor(self.x / self.precision), math.floor(self.y / self.precision)
+
+    def __eq__(self, other: 'Point'):  # same grid cell, so equal points always have same hash
+        return self.key == other.key
 
     def __hash__(self):
-        return hash((self.x, self.y))
+        return hash(self.key)
+
+
+class PointIndex:
+    """Points bucketed into rows and columns, each bucket is sorted along other axis.
+
+    Used instead of list of points in Point.get_right and Point.get_bottom,
+    neighbours are found by binary search in nearby buckets instead of sorting all points.
+    """
+
+    def __init__(self, points: List['Point'], precision=5.0):
+        self.precision = precision
+        self.rows = {}  # type: Dict[int, List[Tuple[int, int, Point]]]
+        self.cols = {}  # type: Dict[int, List[Tuple[int, int, Point]]]
+        for n, point in enumerate(points):  # n keeps order of equal coordinates same as in sorted list
+            self.rows.setdefault(self.bucket(point.y), []).append((point.x, n, point))
+            self.cols.setdefault(self.bucket(point.x), []).append((point.y, n, point))
+        for bucket in itertools.chain(self.rows.values(), self.cols.values()):
+            bucket.sort(key=itemgetter(0, 1))
+        self.rows_x = {key: [x for x, _, _ in row] for key, row in self.rows.items()}
+        self.cols_y = {key: [y for y, _, _ in col] for key, col in self.cols.items()}
+
+    def bucket(self, value):
+        return math.floor(value / self.precision)
+
+    @staticmethod
+    def _after(bucket, keys, value):
+        for n in range(bisect.bisect_right(keys, value), len(bucket)):
+            yield bucket[n]
+
+    def points_to_right(self, point: 'Point'):
+        """Same points as Point.points_to_right, but lazily generated."""
+        key = self.bucket(point.y)
+        candidates = [self._after(self.rows[k], self.rows_x[k], point.x)
+                      for k in (key - 1, key, key + 1) if k in self.rows]
+        for _, _, other in heapq.merge(*candidates, key=itemgetter(0, 1)):
+            if almost_equals(other.y, point.y) and other != point:
+                yield other
+
+    def points_below(self, point: 'Point'):
+        """Same points as Point.points_below, but lazily generated."""
+        key = self.bucket(point.x)
+        candidates = [self._after(self.cols[k], self.cols_y[k], point.y)
+                      for k in (key - 1, key, key + 1) if k in self.cols]
+        for _, _, other in heapq.merge(*candidates, key=itemgetter(0, 1)):
+            if almost_equals(other.x, point.x) and other != point:
+                yield other
 
 
 class Line:
+    __slots__ = ('p1', 'p2', 'vertical')
 
     def __init__(self, p1: 'Point', p2: 'Point'):
         self.p1 = p1
@@ -182,8 +247,27 @@ class Line:
             self.p1.right = True
             self.p2.left = True
 
+    precision = 5.0
+
     def __hash__(self):
-        return hash((self.p1, self.p2, self.vertical))
+        return hash(self.key)
+
+    @property
+    def key(self):
+        """Orientation, position and extent snapped to tolerance grid."""
+        coordinate = self.x if self.vertical else self.y
+        return (self.vertical,
+                math.floor(coordinate / self.precision),
+                math.floor(self.start / self.precision),
+                math.floor(self.end / self.precision))
+
+    @property
+    def start(self):
+        return self.p1.y if self.vertical else self.p1.x
+
+    @property
+    def end(self):
+        return self.p2.y if self.vertical else self.p2.x
 
     @property
     def x(self):
@@ -364,7 +448,7 @@ class Line:
             return self.y == other.y
 
     def __eq__(self, other: 'Line'):
-        return self.on_same_line(other)
+        return self.key == other.key
 
     def corner(self, other: 'Line'):
         if self.p1 == other.p1 or self.p2 == other.p2 or self.p1 == other.p2:
@@ -390,6 +474,37 @@ class Line:
         print()
 
 
+def intersect_lines(vertical: List[Line], horizontal: List[Line], segments=False, precision=5.0) -> np.ndarray:
+    """Finds crossings of every vertical line with every horizontal line in one pass.
+
+    Same math as Line.infite_intersect applied to all pairs at once. With segments=True
+    crossings that lie outside of either line are dropped, ends are matched with same
+    tolerance as almost_equals.
+
+    Returns:
+        Integer array of shape (N, 2) with x and y of crossings, rounded up same as in Point.
+    """
+    if not vertical or not horizontal:
+        return np.empty((0, 2), dtype=int)
+    v = np.array([line.as_tuple for line in vertical], dtype=float).reshape(-1, 4)
+    h = np.array([line.as_tuple for line in horizontal], dtype=float).reshape(-1, 4)
+    vx1, vy1, vx2, vy2 = (v[:, n, None] for n in range(4))
+    hx1, hy1, hx2, hy2 = (h[None, :, n] for n in range(4))
+    v_dx, v_dy = vx1 - vx2, vy1 - vy2
+    h_dx, h_dy = hx1 - hx2, hy1 - hy2
+    div = v_dx * h_dy - h_dx * v_dy
+    v_det = vx1 * vy2 - vy1 * vx2
+    h_det = hx1 * hy2 - hy1 * hx2
+    valid = div != 0
+    div = np.where(valid, div, 1)
+    x = (v_det * h_dx - h_det * v_dx) / div
+    y = (v_det * h_dy - h_det * v_dy) / div
+    if segments:
+        valid &= (y > np.minimum(vy1, vy2) - precision) & (y < np.maximum(vy1, vy2) + precision)
+        valid &= (x > np.minimum(hx1, hx2) - precision) & (x < np.maximum(hx1, hx2) + precision)
+    return np.stack((np.ceil(x[valid]), np.ceil(y[valid])), axis=1).astype(int)
+
+
 class Cell:
     """P1-------P2
         |       |
@@ -398,6 +513,8 @@ class Cell:
         |       |
        P4-------P3
     """
+    __slots__ = ('p1', 'p2', 'p3', 'p4', 'text', 'words')
+
     try:
         font = ImageFont.truetype('arial', size=9)
     except:
@@ -421,8 +538,12 @@ class Cell:
     def clean_text(self) -> str:
         return self.text.replace('\n', ' ')
 
-    def __hash__(self):
-        return hash(self.text) + hash(self.as_tuple)
+    def __hash__(self):  # same for every corner order accepted by __eq__
+        return hash(frozenset(self.key))
+
+    @property
+    def key(self):
+        return self.p1.key, self.p2.key, self.p3.key, self.p4.key
 
     def on_same_line(self, other: 'Cell'):
         return self.p1.on_same_line(other.p1)
@@ -489,6 +610,28 @@ class Cell:
         return x1 < x < x2 and y1 < y < y2
 
 
+class CellGrid:
+    """Uniform grid over cells, point lookups test only cells registered in point's bucket."""
+
+    def __init__(self, cells: List[Cell], size=20.0):
+        self.size = size
+        self.buckets = {}  # type: Dict[Tuple[int, int], List[Cell]]
+        for cell in cells:
+            x1, y1 = cell.p1.as_tuple
+            x2, y2 = cell.p3.as_tuple
+            for bucket_x in range(self.bucket(min(x1, x2)), self.bucket(max(x1, x2)) + 1):
+                for bucket_y in range(self.bucket(min(y1, y2)), self.bucket(max(y1, y2)) + 1):
+                    self.buckets.setdefault((bucket_x, bucket_y), []).append(cell)
+
+    def bucket(self, value):
+        return math.floor(value / self.size)
+
+    def cells_at(self, point: Point) -> List[Cell]:
+        """Cells that contain point, in the same order as cells were given."""
+        bucket = self.buckets.get((self.bucket(point.x), self.bucket(point.y)), [])
+        return [cell for cell in bucket if cell.point_inside_polygon(point)]
+
+
 class Table:
 
     def __init__(self, cells: List[Cell], skeleton: List[List[Cell]], ugly_table: List[List[str]], words, canvas=None):
@@ -498,43 +641,92 @@ class Table:
         self.skeleton = skeleton
         self.ugly_table = ugly_table
         self.global_map = {}
+        self._spans = None  # type: Dict[int, Tuple[int, int, Tuple[int, int]]]
+        self._rows = {}  # type: Dict[int, List[Cell]]
+        self._cols = {}  # type: Dict[int, List[Cell]]
 
     def build_table(self):
+        grid = CellGrid(self.cells)
         for y, (text_row, skeleton_row) in enumerate(zip(self.ugly_table, self.skeleton)):
             self.global_map[y] = {}
             for x, (text, cell) in enumerate(zip(text_row, skeleton_row)):
-                for t_cell in self.cells:
-                    if t_cell.point_inside_polygon(cell.center):
-                        t_cell.text += text if text else ''
-                        self.global_map[y][x] = t_cell
-
-        processed_cells = []
-        for cell in tqdm(self.cells, desc='Analyzing cells', unit='cells'):
-            if cell in processed_cells:
+                for t_cell in grid.cells_at(cell.center):
+                    t_cell.text += text if text else ''
+                    self.global_map[y][x] = t_cell
+
+        processed_cells = set()
+        unique_cells = []
+        for cell in self.cells:
+            if cell.as_tuple in processed_cells:
                 continue
-            in_words = list(filter(lambda char: cell.point_inside_polygon(
-                Point(char['x0'], char['top'])), self.words))
-            cell.words = in_words
-            processed_cells.append(cell)
+            processed_cells.add(cell.as_tuple)
+            cell.words = []
+            unique_cells.append(cell)
+        grid = CellGrid(unique_cells)
+        for word in tqdm(self.words, desc='Analyzing words', unit='words'):
+            for cell in grid.cells_at(Point(word['x0'], word['top'])):
+                cell.words.append(word)
 
         if self.canvas:
             for cell in self.cells:
                 # print(cell.get_text())
                 cell.draw(self.canvas)
+        self.build_index()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_spans'] = None  # keyed by id() of cells, unpickled cells get new ids
+        state['_rows'] = {}
+        state['_cols'] = {}
+        return state
+
+    def build_index(self):
+        """Caches row span, column span and top left position of every cell in global map."""
+        spans = {}  # type: Dict[int, List]
+        for row_id, row in self.global_map.items():
+            for col_id, cell in row.items():
+                span = spans.setdefault(id(cell), [set(), 0, (col_id, row_id)])
+                span[0].add(row_id)
+                if span[2][1] == row_id:
+                    span[1] += 1
+        self._spans = {key: (len(rows), cols, anchor) for key, (rows, cols, anchor) in spans.items()}
+        self._rows.clear()
+        self._cols.clear()
+
+    def invalidate(self):
+        """Drops cached spans, rows and columns, call after changing global map."""
+        self._spans = None
+        self._rows.clear()
+        self._cols.clear()
+
+    def append_row(self, row: Dict[int, Cell]):
+        self.global_map[len(self.global_map)] = row
+        self.invalidate()
 
     def get_col(self, col_id) -> List[Cell]:
-        col = []
-        for row in self.global_map.values():
-            col.append(row[col_id])
-        return col
+        """Returns cached column, don't modify it."""
+        if col_id not in self._cols:
+            col = []
+            for row in self.global_map.values():
+                col.append(row[col_id])
+            self._cols[col_id] = col
+        return self._cols[col_id]
 
     def get_row(self, row_id) -> List[Cell]:
-        return list(self.global_map[row_id].values())
+        """Returns cached row, don't modify it."""
+        if row_id not in self._rows:
+            self._rows[row_id] = list(self.global_map[row_id].values())
+        return self._rows[row_id]
 
     def get_cell(self, x, y) -> Cell:
         return self.global_map[y][x]
 
     def get_cell_span(self, cell):
+        if self._spans is None:
+            self.build_index()
+        if id(cell) in self._spans:
+            row_span, col_span, _ = self._spans[id(cell)]
+            return row_span, col_span
         temp = {}
         for row_id, row in self.global_map.items():
 
@@ -547,95 +739,206 @@ class Table:
         col_span = len(list(temp.values())[0])
         return row_span, col_span
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable form of table, cells and words are referenced by their index."""
+        cell_ids = {}  # type: Dict[int, int]
+        cells = []  # type: List[Dict[str, Any]]
+        word_ids = {id(word): n for n, word in enumerate(self.words)}
+
+        def cell_id(cell: Cell):
+            if id(cell) not in cell_ids:
+                cell_ids[id(cell)] = len(cells)
+                cells.append({'points': [cell.p1.as_tuple, cell.p2.as_tuple, cell.p3.as_tuple, cell.p4.as_tuple],
+                              'text': cell.text,
+                              'words': [word_ids[id(word)] for word in cell.words if id(word) in word_ids]})
+            return cell_ids[id(cell)]
+
+        return {
+            'table_cells': [cell_id(cell) for cell in self.cells],
+            'skeleton': [[cell_id(cell) for cell in row] for row in self.skeleton],
+            'global_map': [[[col_id, cell_id(cell)] for col_id, cell in row.items()]
+                           for _, row in sorted(self.global_map.items())],
+            'ugly_table': self.ugly_table,
+            'words': self.words,
+            'cells': cells,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Table':
+        """Restores table saved by to_dict, cells shared in global map stay shared."""
+        words = data['words']
+        cells = []
+        for record in data['cells']:
+            cell = Cell(*(Point(xy) for xy in record['points']))
+            cell.text = record['text']
+            cell.words = [words[n] for n in record['words']]
+            cells.append(cell)
+        table = cls([cells[n] for n in data['table_cells']],
+                    [[cells[n] for n in row] for row in data['skeleton']],
+                    data['ugly_table'], words)
+        for row_id, row in enumerate(data['global_map']):
+            table.global_map[row_id] = {col_id: cells[n] for col_id, n in row}
+        table.build_index()
+        return table
+
+    def get_cell_anchor(self, cell) -> Tuple[int, int]:
+        """Returns x and y of top left position of cell in global map."""
+        if self._spans is None:
+            self.build_index()
+        _, _, anchor = self._spans[id(cell)]
+        return anchor
+
 
 class TableExtractor:
+    version = 1  # bump when parsing changes, invalidates TableCache entries
+    table_settings = {'snap_tolerance': 3, 'join_tolerance': 3}  # type: Dict[str, Any]
+    jobs = 1  # worker processes used by parse_pages, pages are parsed in this process by default
+    release_pages = True  # drop page's layout objects after parse_page
 
-    def __init__(self, path):
-        self.pdf = pdfplumber.open(path)
+    def __init__(self, source):
+        """
+        Args:
+            source: DataSheet or already opened pdfplumber document to reuse, or path to PDF file.
+        """
+        self.datasheet = None  # type: DataSheet
+        if isinstance(source, DataSheet):
+            self.datasheet = source
+            self.pdf = source.plumber
+            self.path = str(source.path)
+        elif isinstance(source, pdfplumber.pdf.PDF):
+            self.pdf = source
+            self.path = getattr(source.stream, 'name', None)  # type: str
+        else:
+            self.pdf = pdfplumber.open(source)
+            self.path = str(source)
         self.draw = False
         self.debug = False
+        self.vectorized = True  # False intersects lines one pair at a time, useful for debugging
 
     @staticmethod
-    def filter_lines(lines: List[Line]):
+    def filter_lines(lines: List[Line], precision=5.0):
+        """Removes duplicate lines and merges overlapping lines that lie on the same row or column."""
+        lines = set(lines)
+        snap_x = TableExtractor.snap_coordinates([line.x for line in lines if line.vertical], precision)
+        snap_y = TableExtractor.snap_coordinates([line.y for line in lines if not line.vertical], precision)
+        collinear = {}  # type: Dict[Tuple[bool, int], List[Line]]
+        for line in lines:
+            position = snap_x[line.x] if line.vertical else snap_y[line.y]
+            collinear.setdefault((line.vertical, position), []).append(line)
         new_lines = []
-        lines = list(set(lines))
-        la = new_lines.append
-        for line1 in tqdm(lines, desc='Filtering lines', unit='lines'):
-            if line1 in new_lines:
-                continue
-            la(line1)
-        new_lines = list(set(new_lines))
+        for (vertical, position), group in tqdm(collinear.items(), desc='Filtering lines', unit='lines'):
+            group.sort(key=lambda l: (l.start, l.end))
+            spans = [[group[0].start, group[0].end]]
+            for line in group[1:]:
+                if line.start > spans[-1][1] + precision:
+                    spans.append([line.start, line.end])
+                elif line.end > spans[-1][1]:
+                    spans[-1][1] = line.end
+            for start, end in spans:  # merged lines are placed exactly on snapped row or column
+                if vertical:
+                    new_lines.append(Line(Point(position, start), Point(position, end)))
+                else:
+                    new_lines.append(Line(Point(start, position), Point(end, position)))
         return new_lines
 
     @staticmethod
-    def add_skeleton_points(points, line):
-        points.append(line.p1)
-        points.append(line.p2)
+    def snap_coordinates(coordinates, precision=5.0) -> Dict[int, int]:
+        """Groups coordinates that are closer than precision.
+
+        Returns:
+            Dict that maps every coordinate to the first coordinate of it's group.
+        """
+        snapped = {}
+        anchor = None
+        for coordinate in sorted(set(coordinates)):
+            if anchor is None or not almost_equals(coordinate, anchor, precision):
+                anchor = coordinate
+            snapped[coordinate] = anchor
+        return snapped
 
     def build_skeleton(self, lines):
-        skeleton_points = []
+        """Builds table grid from crossings of vertical and horizontal lines.
+
+        Coordinates are snapped to tolerance grid, so every grid point is stored once
+        and points are deduplicated by hashing their snapped coordinates.
+        """
         skeleton = []
-        temp_point = Point(0, 0)
-        temp_point.down = temp_point.up = temp_point.left = temp_point.right = True
-        vertical = list(filter(lambda l: l.vertical, lines))
-        horizontal = list(filter(lambda l: not l.vertical, lines))
-        for line1 in tqdm(vertical, desc='Building table skeleton', unit='lines'):
-            sys.stdout.flush()
-            if line1.length < 3.0:
-                continue
-            self.add_skeleton_points(skeleton_points, line1)
-            for line2 in horizontal:
-                if line1 == line2:
-                    continue
-                self.add_skeleton_points(skeleton_points, line2)
-                if line1.infite_intersect(line2):
-                    p1 = Point(line1.infite_intersect(line2))
-                    if p1 not in skeleton_points:
-                        skeleton_points.append(p1)
-
-                    for n, p in enumerate(skeleton_points):
-                        skeleton_points[n].copy(temp_point)
-                        if p == p1:
-                            p1.copy(p)
-                            skeleton_points[n] = p1
-        skeleton_points = list(set(skeleton_points))
+        vertical = [line for line in lines if line.vertical and line.length >= 3.0]
+        horizontal = [line for line in lines if not line.vertical]
+        if not vertical:
+            return [], []
+        if self.vectorized:
+            crossings = intersect_lines(vertical, horizontal).tolist()
+        else:
+            crossings = []
+            for line1 in tqdm(vertical, desc='Building table skeleton', unit='lines'):
+                for line2 in horizontal:
+                    x, y = line1.infite_intersect(line2)
+                    if x is not None:
+                        crossings.append(Point(x, y).as_tuple)
+        points = [point.as_tuple for line in vertical + horizontal for point in (line.p1, line.p2)] + crossings
+        snap_x = self.snap_coordinates([x for x, _ in points])
+        snap_y = self.snap_coordinates([y for _, y in points])
+        grid = set()  # type: Set[Tuple[int, int]]
+        for x, y in points:
+            grid.add((snap_x[x], snap_y[y]))
+        skeleton_points = []
+        for xy in grid:
+            point = Point(xy)
+            point.down = point.up = point.left = point.right = True
+            skeleton_points.append(point)
+        point_index = PointIndex(skeleton_points)
+        processed_cells = set()  # type: Set[Tuple]
         sorted_y_points = sorted(skeleton_points, key=lambda other: other.y)
         for p1 in tqdm(sorted_y_points, desc='Building skeleton cells', unit='point'):
-            p2 = p1.get_right(skeleton_points)
+            p2 = p1.get_right(point_index)
             if p2:
-                p3 = p2.get_bottom(skeleton_points, right=True)
-                p4 = p1.get_bottom(skeleton_points, left=True)
+                p3 = p2.get_bottom(point_index, right=True)
+                p4 = p1.get_bottom(point_index, left=True)
                 if p3 and p4:
                     cell = Cell(p1, p2, p3, p4)
-                    if cell not in skeleton:
-                        skeleton.append(cell)
-                    else:
+                    if cell.key in processed_cells:  # grid points are at least precision apart, so keys are exact
                         continue
+                    processed_cells.add(cell.key)
+                    skeleton.append(cell)
         return skeleton_points, skeleton
 
     @staticmethod
     def skeleton_to_2d_table(skeleton: List[Cell]) -> List[List[Cell]]:
-        rows = []
+        snap_y = TableExtractor.snap_coordinates([cell.p1.y for cell in skeleton])
+        rows = {}  # type: Dict[int, List[Cell]]
         for cell in tqdm(skeleton, desc='Analyzing cell positions', unit='cells'):
-            row = tuple(sorted(filter(lambda c: cell.on_same_row(c), skeleton), key=lambda c: c.p1.x))
-            rows.append(row)
-        rows = list(sorted(list(set(rows)), key=lambda c: c[0].p1.y))
-        rows = [list(row) for row in rows]
-        return rows
+            rows.setdefault(snap_y[cell.p1.y], []).append(cell)
+        return [sorted(rows[y], key=lambda c: c.p1.x) for y in sorted(rows)]
+
+    def page_words(self, page_n):
+        """Words of page, shared through datasheet's text cache when extractor was created from DataSheet."""
+        if self.datasheet is not None:
+            return self.datasheet.page_words(page_n, release=False)  # parse_page releases page
+        return self.pdf.pages[page_n].extract_words()
 
     def parse_page(self, page_n):
+        """Finds and parses tables of page, page's layout objects are released afterwards."""
         if self.debug:
             print('Parsing page', page_n)
         page = self.pdf.pages[page_n]
+        try:
+            return self.parse_tables(page, page_n)
+        finally:
+            if self.release_pages:
+                release_page(page)
+
+    def parse_tables(self, page: pdfplumber.pdf.Page, page_n):
         if self.debug:
             print('Rendering page')
 
         if self.debug:
             print('Finding tables')
-        tables = TableFinder(page, {'snap_tolerance': 3, 'join_tolerance': 3})
+        tables = TableFinder(page, self.table_settings)
         if self.debug:
             print('Found', len(tables.tables), 'tables')
         beaut_tables = []
+        words = None  # extracted once for all tables on page
         if self.draw:
             p_im = page.to_image(resolution=100)
             p_im.draw_lines(page.lines)
@@ -692,7 +995,9 @@ class TableExtractor:
             # for p in points:
             #     p.draw(canvas)
 
-            beaut_table = Table(cells, skeleton, ugly_table, page.extract_words())
+            if words is None:
+                words = self.page_words(page_n)
+            beaut_table = Table(cells, skeleton, ugly_table, words)
             beaut_table.build_table()
             if self.draw:
                 for cell in beaut_table.cells:
@@ -713,6 +1018,97 @@ class TableExtractor:
 
         return beaut_tables
 
+    def page_pool(self, jobs: int = None) -> ProcessPoolExecutor:
+        """
+        Worker processes for parse_pages, every worker opens this PDF once and keeps it open.
+
+        Caller owns the pool, it should be reused for all pages of the PDF and shut down afterwards.
+        """
+        return ProcessPoolExecutor(jobs or self.jobs, initializer=_open_page_extractor, initargs=(self.path,))
+
+    def parse_pages(self, pages: List[int], skip_errors=False,
+                    executor: ProcessPoolExecutor = None) -> List[List[Table]]:
+        """
+        Parses pages, in worker processes if executor is given or jobs is more than 1.
+
+        Pages are parsed in this process if there is only one page or one job,
+        when tables are drawn or when PDF was opened without path.
+
+        Args:
+            pages: Zero based page numbers.
+            skip_errors: Return None for pages that failed to parse instead of raising.
+            executor: Pool made by page_pool of same PDF, temporary pool is made if it's not given.
+
+        Returns:
+            Tables of every page, in same order as pages.
+        """
+        if self.draw or self.path is None:
+            executor = None
+        elif executor is None and min(self.jobs, len(pages)) > 1:
+            with self.page_pool(min(self.jobs, len(pages))) as executor:
+                return self.parse_pages(pages, skip_errors, executor)
+        if executor is None:
+            return [_parse_page(self, page_n, skip_errors) for page_n in pages]
+        return list(executor.map(_parse_page_worker, pages, itertools.repeat(skip_errors)))
+
+
+_page_extractor = None  # type: TableExtractor
+
+
+def _open_page_extractor(path):
+    global _page_extractor
+    _page_extractor = TableExtractor(path)
+
+
+def _parse_page_worker(page_n, skip_errors):
+    return _parse_page(_page_extractor, page_n, skip_errors)
+
+
+def _parse_page(extractor: TableExtractor, page_n, skip_errors):
+    try:
+        return extractor.parse_page(page_n)
+    except Exception:
+        if not skip_errors:
+            raise
+        return None
+
+
+class TableCache:
+    """On-disk cache of parsed tables.
+
+    Entries are keyed by PDF content hash, page number, TableFinder settings and extractor version,
+    so changing any of them makes old entries unreachable.
+    """
+    cache_path = Path(r'./cache/tables').absolute()
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else self.cache_path
+        self.settings = TableExtractor.table_settings
+        self.version = TableExtractor.version
+
+    def get_path(self, pdf_hash: str, page_n: int) -> Path:
+        key = json.dumps({'settings': self.settings, 'version': self.version}, sort_keys=True)
+        digest = hashlib.sha256(key.encode()).hexdigest()[:16]
+        return self.path / pdf_hash / '{}-{}.json'.format(page_n, digest)
+
+    def load(self, pdf_hash: str, page_n: int):
+        """Returns cached tables of page or None if page wasn't cached."""
+        path = self.get_path(pdf_hash, page_n)
+        if not path.exists():
+            return None
+        try:
+            with path.open('r') as fp:
+                data = json.load(fp)
+            return [Table.from_dict(table) for table in data]
+        except (ValueError, KeyError, IndexError, TypeError):  # damaged entry is treated as missing one
+            return None
+
+    def save(self, pdf_hash: str, page_n: int, tables: List[Table]):
+        path = self.get_path(pdf_hash, page_n)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open('w') as fp:
+            json.dump([table.to_dict() for table in tables], fp, default=float)  # pdfplumber uses Decimal
+
 
 # def pdfplumber_table_to_table():
 
@@ -1,4 +1,9 @@
+import json
+import os
 import re
+import stat
+import tempfile
+from pathlib import Path
 
 
 def is_int(val):
@@ -23,6 +28,12 @@ def is_float(val):
 def is_float_or_int(val):
     return is_float(val) or is_int(val)
 
+def split_cmp_type(name):
+    """Splits requirement name into feature name and comparison type, > is default."""
+    if name[-1:] in ('<', '>', '='):
+        return name[:-1], name[-1]
+    return name, '>'
+
 def clean_line(line: str):
     line = line.replace('–', '-')
     line = line.replace('-', '-')
@@ -216,3 +227,23 @@ def latin1_to_ascii(unicrap):
         else:
             r += str(i)
     return r
+
+
+def dump_json_atomic(data, path, **kwargs):
+    """Writes JSON to temporary file next to path and renames it over path, so path is never half written."""
+    path = Path(path)
+    with tempfile.NamedTemporaryFile('w', dir=str(path.parent), prefix=path.name, suffix='.tmp', delete=False) as fp:
+        try:
+            json.dump(data, fp, **kwargs)
+            fp.flush()
+            os.fsync(fp.fileno())
+        except BaseException:
+            fp.close()
+            os.remove(fp.name)
+            raise
+    try:  # temporary file is created with 0600, keep permissions of replaced file
+        os.chmod(fp.name, stat.S_IMODE(path.stat().st_mode) if path.exists() else 0o644)
+    except BaseException:
+        os.remove(fp.name)
+        raise
+    os.replace(fp.name, str(path))